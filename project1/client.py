@@ -5,9 +5,10 @@ import datetime as dt
 
 class Client:
 
-    def __init__(self, port : int = rpc.DEFAULT_PORT) -> None:
-        # register with server.
-        self.client_rpc = rpc.RPCClient(port=port)
+    def __init__(self, port : int = rpc.DEFAULT_PORT, timeout : float = None) -> None:
+        # register with server. The pool reconnects transparently if the server restarts.
+        # No timeout by default: 'add' and 'report' query the data API once per ticker and can be slow.
+        self.client_rpc = rpc.RPCClientPool(port=port, size=1, timeout=timeout)
 
         self.register()
     
@@ -95,22 +96,26 @@ def _process_arguments( client : Client ):
     while True:
         inp = input("> ")
 
-        if inp.startswith("data "):
-            client.get_data(inp.split(" ")[1])
+        try:
+            if inp.startswith("data "):
+                client.get_data(inp.split(" ")[1])
 
-        elif inp.startswith("add "):
-            client.change_ticker(inp.split(" ")[1], "add")
+            elif inp.startswith("add "):
+                client.change_ticker(inp.split(" ")[1], "add")
 
-        elif inp.startswith("delete "):
-            client.change_ticker(inp.split(" ")[1], "delete")
+            elif inp.startswith("delete "):
+                client.change_ticker(inp.split(" ")[1], "delete")
 
-        elif inp.startswith("report"):
-            client.reconstruct_report()
+            elif inp.startswith("report"):
+                client.reconstruct_report()
 
-        elif inp.startswith("q"):
-            break
-        else:
-            _help()
+            elif inp.startswith("q"):
+                break
+            else:
+                _help()
+        except OSError as e:
+            # Timeouts & connection errors: the server may still complete the request.
+            print(f"Request failed ({e!r}). The server may still be processing it; try again later.")
 
 
 if __name__ == '__main__':
@@ -1,10 +1,30 @@
 import json
+import time
+import queue
 import socket
 import inspect
+import threading
 from threading import Thread
 
 SIZE=1024
 DEFAULT_PORT=8000
+DEFAULT_TIMEOUT=10.0
+# Calls that can safely be re-sent if the connection drops mid-call.
+IDEMPOTENT_METHODS=frozenset({'client_get_data'})
+
+
+class RequestNotSentError(ConnectionError):
+    """ The request never made it to the server, so it is safe to send it again. """
+
+
+def _encode(message) -> bytes:
+    """ Messages are newline-delimited JSON, so a stream can carry several of them. """
+    return json.dumps(message).encode() + b'\n'
+
+
+def _send(sock:socket.socket, message) -> None:
+    sock.sendall(_encode(message))
+
 
 class RPCServer:
     def __init__(self, host:str='0.0.0.0', port:int=DEFAULT_PORT) -> None:
@@ -16,9 +36,10 @@ class RPCServer:
 
     def __handle__(self, client:socket.socket, address:tuple) -> None:
         print(f'Managing requests from {address}.')
+        reader = client.makefile('rb')
         while True:
             try:
-                functionName, args, kwargs = json.loads(client.recv(SIZE).decode())
+                functionName, args, kwargs = json.loads(reader.readline().decode())
             except: 
                 print(f'! Client {address} disconnected.')
                 break
@@ -29,11 +50,12 @@ class RPCServer:
                 response = self._methods[functionName](*args, **kwargs)
             except Exception as e:
                 # Send back exeption if function called by client is not registred 
-                client.sendall(json.dumps(str(e)).encode())
+                _send(client, str(e))
             else:
-                client.sendall(json.dumps(response).encode())
+                _send(client, response)
 
         print(f'Completed requests from {address}.')
+        reader.close()
         client.close()
     
     def _get_port(self):
@@ -66,31 +88,217 @@ class RPCServer:
 
 
 class RPCClient:
-    def __init__(self, host:str='localhost', port:int=DEFAULT_PORT) -> None:
+    def __init__(self, host:str='localhost', port:int=DEFAULT_PORT, timeout:float=None) -> None:
         self.__sock = None
+        self.__buffer = b''
         self.__address = (host, port)
+        self.__timeout = timeout
+        # One call at a time per socket, otherwise responses get interleaved.
+        self.__lock = threading.Lock()
 
     def connect(self):
         try:
-            self.__sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            self.__sock.connect(self.__address)
-        except EOFError as e:
-            print(e)
-            raise Exception('Client was not able to connect.')
+            self.__sock = socket.create_connection(self.__address, timeout=self.__timeout)
+            self.__sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            self.__buffer = b''
+        except OSError as e:
+            raise ConnectionError(f'Client was not able to connect to {self.__address}.') from e
     
     def disconnect(self):
         try:
             self.__sock.close()
         except:
             pass
+        self.__sock = None
+
+    def is_alive(self) -> bool:
+        """
+        Cheap health check: the socket is usable if the server hasn't closed it and
+        there is no unread data left over from an earlier call.
+        """
+        if self.__sock is None or self.__buffer:
+            return False
+        try:
+            self.__sock.setblocking(False)
+            # Anything readable here is either EOF or a stray response.
+            self.__sock.recv(1, socket.MSG_PEEK)
+            return False
+        except BlockingIOError:
+            return True
+        except OSError:
+            return False
+        finally:
+            try:
+                self.__sock.settimeout(self.__timeout)
+            except OSError:
+                pass
+
+    def __readline(self) -> bytes:
+        while b'\n' not in self.__buffer:
+            chunk = self.__sock.recv(SIZE)
+            if not chunk:
+                raise ConnectionError(f'Server {self.__address} closed the connection.')
+            self.__buffer += chunk
+        line, self.__buffer = self.__buffer.split(b'\n', 1)
+        return line
+
+    def call(self, functionName:str, args:tuple=(), kwargs:dict=None, timeout:float=None):
+        """
+        Call functionName on the server.
+        timeout (seconds) overrides the client's timeout for this call only.
+        Raises OSError (incl. socket.timeout / ConnectionError) if the connection fails,
+        in which case the client is disconnected.
+        """
+        # Encode first so that bad arguments fail before the socket is touched.
+        message = _encode((functionName, args, kwargs or {}))
+        with self.__lock:
+            if self.__sock is None:
+                raise RequestNotSentError('Client is not connected.')
+            try:
+                self.__sock.settimeout(self.__timeout if timeout is None else timeout)
+                try:
+                    self.__sock.sendall(message)
+                except OSError as e:
+                    # Without its trailing newline, a partial request is never executed by the server.
+                    raise RequestNotSentError(f'Request could not be sent to {self.__address}.') from e
+                response = self.__readline()
+                self.__sock.settimeout(self.__timeout)
+            except BaseException:
+                # The stream may be half-way through a request or response: it can't be reused.
+                self.disconnect()
+                raise
+        return json.loads(response.decode())
     
     def __getattr__(self, __name: str):
         def excecute(*args, **kwargs):
-            self.__sock.sendall(json.dumps((__name, args, kwargs)).encode())
-
-            response = json.loads(self.__sock.recv(SIZE).decode())
-   
-            return response
+            return self.call(__name, args, kwargs)
         
         return excecute
 
+
+class RPCClientPool:
+    """
+    Thread-safe pool of RPCClient connections to one server.
+
+    Connections are opened lazily up to `size` and reused across calls and threads.
+    A connection is health checked when it is taken from the pool and dropped on any
+    error, so a restarted server is reconnected to transparently. Calls in `idempotent`
+    are retried on a fresh connection up to `retries` times; other calls are only
+    retried if the connection could not be opened or the request could not be sent.
+
+    Exposes the same interface as RPCClient (connect, disconnect, call, client_* methods).
+    After disconnect(), calls fail with ConnectionError until connect() is called again.
+    """
+
+    def __init__(
+        self,
+        host:str='localhost',
+        port:int=DEFAULT_PORT,
+        size:int=4,
+        timeout:float=DEFAULT_TIMEOUT,
+        retries:int=2,
+        backoff:float=0.1,
+        idempotent:frozenset=IDEMPOTENT_METHODS
+    ) -> None:
+        if size < 1:
+            raise ValueError('RPCClientPool size must be at least 1.')
+        self.__host = host
+        self.__port = port
+        self.__timeout = timeout
+        self.__retries = retries
+        self.__backoff = backoff
+        self.__idempotent = frozenset(idempotent)
+        self.__idle = queue.LifoQueue()
+        self.__slots = threading.BoundedSemaphore(size)
+        # Guards __closed against connections being returned while disconnect() drains the pool.
+        self.__lock = threading.Lock()
+        self.__closed = False
+
+    def __new_client(self) -> RPCClient:
+        client = RPCClient(host=self.__host, port=self.__port, timeout=self.__timeout)
+        client.connect()
+        return client
+
+    def __acquire(self) -> RPCClient:
+        if not self.__slots.acquire(timeout=self.__timeout):
+            raise TimeoutError('No connection available in RPCClientPool.')
+        try:
+            while True:
+                try:
+                    client = self.__idle.get_nowait()
+                except queue.Empty:
+                    return self.__new_client()
+                if client.is_alive():
+                    return client
+                client.disconnect()
+        except:
+            self.__slots.release()
+            raise
+
+    def __release(self, client:RPCClient=None) -> None:
+        if client is not None:
+            with self.__lock:
+                if self.__closed:
+                    client.disconnect()
+                else:
+                    self.__idle.put(client)
+        self.__slots.release()
+
+    def connect(self):
+        """ (Re)open the pool, with one connection up front so that an unreachable server fails fast. """
+        with self.__lock:
+            self.__closed = False
+        self.__release(self.__acquire())
+
+    def disconnect(self):
+        """ Close the idle connections. Connections in use are closed when returned. """
+        with self.__lock:
+            self.__closed = True
+            while True:
+                try:
+                    self.__idle.get_nowait().disconnect()
+                except queue.Empty:
+                    break
+
+    def call(self, functionName:str, args:tuple=(), kwargs:dict=None, timeout:float=None):
+        """
+        Call functionName on the server using a pooled connection.
+        timeout (seconds) overrides the pool's timeout for this call only.
+        """
+        if self.__closed:
+            raise ConnectionError('RPCClientPool is disconnected.')
+        for attempt in range(self.__retries + 1):
+            if attempt:
+                time.sleep(self.__backoff * 2 ** (attempt - 1))
+
+            try:
+                client = self.__acquire()
+            except ConnectionError:
+                # Nothing was sent yet, so retrying is safe for any call.
+                if attempt == self.__retries:
+                    raise
+                continue
+
+            try:
+                return client.call(functionName, args, kwargs, timeout)
+            except RequestNotSentError:
+                # Nothing reached the server, so retrying is safe for any call.
+                if attempt == self.__retries:
+                    raise
+            except (OSError, ValueError):
+                # Timeout, dropped connection or garbled response.
+                if functionName not in self.__idempotent or attempt == self.__retries:
+                    raise
+            finally:
+                # RPCClient drops its socket if a call fails mid-way; only healthy connections go back.
+                if client.is_alive():
+                    self.__release(client)
+                else:
+                    client.disconnect()
+                    self.__release()
+
+    def __getattr__(self, __name: str):
+        def excecute(*args, **kwargs):
+            return self.call(__name, args, kwargs)
+        
+        return excecute
@@ -0,0 +1,137 @@
+import time
+import socket
+import threading
+import pytest
+
+import rpc
+
+
+class Service:
+    def __init__(self) -> None:
+        self.calls = 0
+
+    def client_get_data(self, time_spec : str) -> str:
+        return f"data for {time_spec}"
+
+    def client_echo(self, value):
+        return value
+
+    def client_sleep(self, seconds : float) -> float:
+        self.calls += 1
+        time.sleep(seconds)
+        return seconds
+
+
+class LocalServer:
+    """ RPCServer's request handler behind an accept loop that can be stopped & restarted on the same port. """
+
+    def __init__(self) -> None:
+        self.service = Service()
+        self.rpc_server = rpc.RPCServer(host='127.0.0.1', port=0)
+        self.rpc_server.registerInstance(self.service)
+        self.port = 0
+        self.start()
+
+    def start(self) -> None:
+        self._sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self._sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self._sock.bind(('127.0.0.1', self.port))
+        self._sock.listen()
+        self.port = self._sock.getsockname()[1]
+        self._clients = []
+        threading.Thread(target=self._accept, args=[self._sock, self._clients], daemon=True).start()
+
+    def _accept(self, sock, clients) -> None:
+        while True:
+            try:
+                client, address = sock.accept()
+            except OSError:
+                return
+            clients.append(client)
+            threading.Thread(target=self.rpc_server.__handle__, args=[client, address], daemon=True).start()
+
+    def stop(self) -> None:
+        for sock in [self._sock] + self._clients:
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+            sock.close()
+
+
+@pytest.fixture
+def server():
+    server = LocalServer()
+    yield server
+    server.stop()
+
+
+def test_concurrent_calls(server):
+    pool = rpc.RPCClientPool(port=server.port, size=4, timeout=5)
+    errors = []
+
+    def work(i):
+        for j in range(200):
+            response = pool.client_echo([i, j])
+            if response != [i, j]:
+                errors.append((i, j, response))
+
+    threads = [threading.Thread(target=work, args=[i]) for i in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    pool.disconnect()
+
+
+def test_reconnects_after_server_restart(server):
+    pool = rpc.RPCClientPool(port=server.port, size=2, timeout=5)
+    pool.connect()
+    assert pool.client_get_data("2024-01-02-10:00") == "data for 2024-01-02-10:00"
+
+    server.stop()
+    server.start()
+    time.sleep(0.1)
+
+    assert pool.client_get_data("2024-01-03-10:00") == "data for 2024-01-03-10:00"
+    assert pool.client_echo(1) == 1
+    pool.disconnect()
+
+
+def test_timeout_on_non_idempotent_call_is_not_retried(server):
+    pool = rpc.RPCClientPool(port=server.port, size=1, timeout=5, backoff=0.01)
+
+    with pytest.raises(TimeoutError):
+        pool.call('client_sleep', (0.5,), timeout=0.1)
+    time.sleep(0.6)
+
+    assert server.service.calls == 1
+    assert pool.client_echo(2) == 2
+    pool.disconnect()
+
+
+def test_bad_argument_does_not_leak_slot(server):
+    # A leaked slot would make the next call wait for the pool timeout and fail.
+    pool = rpc.RPCClientPool(port=server.port, size=1, timeout=0.5)
+
+    for _ in range(3):
+        with pytest.raises(TypeError):
+            pool.client_get_data(object())
+
+    assert pool.client_echo(3) == 3
+    pool.disconnect()
+
+
+def test_disconnect_closes_pool(server):
+    pool = rpc.RPCClientPool(port=server.port, size=1, timeout=5)
+    pool.connect()
+    pool.disconnect()
+
+    with pytest.raises(ConnectionError):
+        pool.client_echo(4)
+
+    pool.connect()
+    assert pool.client_echo(5) == 5
+    pool.disconnect()
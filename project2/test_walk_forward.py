@@ -0,0 +1,89 @@
+import os
+import numpy as np
+import pandas as pd
+import pytest
+
+import walk_forward as wf
+
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), "data") + "/"
+WINDOWS = [5, 10, 20, 40]
+
+
+@pytest.fixture(scope="module")
+def data():
+    return wf.load_data(DATA_DIR)
+
+
+def _reference_signal(shocks : pd.DataFrame, window : int, max_window : int = 40) -> pd.Series:
+    """ The notebook's shock signal, computed in one go with pandas. """
+    with np.errstate(all='ignore'):
+        df = shocks / shocks.rolling(window=window).std()
+        indicator = df.mean(axis=1)
+        return indicator / indicator.rolling(window=max_window).max()
+
+
+def _reference_fold(shocks, returns, windows, train_start, test_start, test_end):
+    """ Refit & score one fold from scratch, using only the data up to the end of its test slice. """
+    returns = returns.iloc[:test_end]
+    shocks = shocks.loc[:returns.index[-1]]
+    known = returns.index - pd.Timedelta(days=1)
+
+    in_sample, oos = [], []
+    for w in windows:
+        position = _reference_signal(shocks, w).reindex(known, method='ffill').to_numpy()
+        with np.errstate(invalid='ignore'):
+            pnl = returns.to_numpy() * position[:, None]
+        pnl = pd.DataFrame(np.where(np.isfinite(pnl), pnl, 0.), index=returns.index, columns=returns.columns)
+
+        train = pnl.iloc[train_start:test_start]
+        std = train.std(ddof=0)
+        in_sample.append(np.where(std > 0, train.mean() / std * np.sqrt(wf.TRADING_DAYS), 0.))
+        oos.append(pnl.iloc[test_start:test_end].sum().to_numpy())
+
+    best = np.argmax(np.array(in_sample), axis=0)
+    return [windows[b] for b in best], [oos[b][i] for i, b in enumerate(best)]
+
+
+@pytest.mark.parametrize("country", wf.COUNTRIES)
+@pytest.mark.parametrize("window", WINDOWS)
+def test_shock_signal_matches_notebook(data, country, window):
+    _, economic_data = data
+    shocks = wf.calc_shocks(economic_data[country])
+    expected = _reference_signal(shocks, window).to_numpy()
+
+    # Feed the shocks in uneven chunks, as the walk-forward engine does.
+    signal = wf.ShockSignal(shocks.shape[1], window)
+    bounds = [0, 1, 7, 50, 51, 120, 250, len(shocks)]
+    got = np.concatenate([signal.update(shocks.to_numpy()[a:b]) for a, b in zip(bounds[:-1], bounds[1:])])
+
+    np.testing.assert_allclose(got, expected, rtol=1e-6, atol=1e-12)
+
+
+@pytest.mark.parametrize("country", wf.COUNTRIES)
+@pytest.mark.parametrize("expanding", [False, True])
+def test_walk_forward_matches_refit_from_scratch(data, country, expanding):
+    asset_prices, economic_data = data
+    shocks = wf.calc_shocks(economic_data[country])
+    returns = wf.calc_returns(asset_prices, wf.COUNTRY_ASSETS[country])
+
+    engine = wf.WalkForward(shocks, returns, windows=WINDOWS, train_size=750, test_size=250, expanding=expanding)
+    results = engine.run().set_index(['fold', 'asset'])
+    assert len(results) == len(engine.folds()) * len(engine.assets)
+
+    for fold, (train_start, test_start, test_end) in enumerate(engine.folds()):
+        windows, oos_pnl = _reference_fold(shocks, engine.returns, WINDOWS, train_start, test_start, test_end)
+        for i, asset in enumerate(engine.assets):
+            row = results.loc[(fold, asset)]
+            assert row['window'] == windows[i]
+            assert row['oos_pnl'] == pytest.approx(oos_pnl[i], rel=1e-6, abs=1e-12)
+
+
+def test_walk_forward_rejects_bad_windows(data):
+    asset_prices, economic_data = data
+    shocks = wf.calc_shocks(economic_data['US'])
+    returns = wf.calc_returns(asset_prices, wf.COUNTRY_ASSETS['US'])
+
+    for kwargs in ({'windows': [1]}, {'windows': []}, {'max_window': 0}, {'train_size': 0}):
+        with pytest.raises(ValueError):
+            wf.WalkForward(shocks, returns, **kwargs)
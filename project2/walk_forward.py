@@ -0,0 +1,465 @@
+import sys
+import glob
+import collections
+import numpy as np
+import pandas as pd
+
+
+DATA_DIR = "./data/"
+COUNTRIES = ['US', 'CA']
+DATA_LABELS = ['Unemployment', 'IndustrialProduction', 'GDP', 'HomeSales']
+COUNTRY_ASSETS = {
+    'US': ['ES1 Index', 'DXY Curncy'],
+    'CA': ['PT1 Index', 'CADUSD Curncy'],
+}
+TRADING_DAYS = 252
+
+
+# ************************ #
+# ------------------------ #
+# Loading data & building shocks (same logic as the notebook)
+# ------------------------ #
+# ************************ #
+
+def load_data(data_dir : str = DATA_DIR) -> tuple[pd.DataFrame, dict]:
+    """
+    Load the asset prices and the economic data, keyed the same way as in the notebook.
+
+    Returns
+    -------
+    asset_prices : pd.DataFrame
+    economic_data : dict
+        economic_data[country][label] -> pd.DataFrame
+    """
+    data = {}
+    for csv_file in glob.glob(data_dir + "*.csv"):
+        data_key = csv_file.rsplit('/', 1)[-1].split('.')[0]
+        df = pd.read_csv(csv_file)
+        df.set_index('dates', inplace=True)
+        df.index = pd.to_datetime(df.index)
+        data[data_key] = df
+
+    economic_data = {}
+    for country in COUNTRIES:
+        economic_data[country] = {label: data[f'{country}_{label}'] for label in DATA_LABELS}
+
+    return data['asset_prices'], economic_data
+
+
+def calc_shocks(country_data : dict) -> pd.DataFrame:
+    """
+    Shock of every indicator ( actual / expected - 1 ), aligned on the release dates.
+    Unemployment shocks are negated since a lower than expected unemployment is good news.
+    The rolling std normalisation is left to the walk-forward engine.
+    """
+    frames = []
+    for indicator, indicator_data in country_data.items():
+        shock = (indicator_data['actual_value'] / indicator_data['expected_value']) - 1.
+        if indicator == "Unemployment":
+            shock = -1 * shock
+        frames.append(shock.rename(indicator + '_shock'))
+
+    df = pd.concat(frames, axis=1, ignore_index=False, sort=True)
+    df.ffill(inplace=True)
+    df.dropna(axis=0, how='any', inplace=True)
+    return df
+
+
+def calc_returns(asset_prices : pd.DataFrame, assets : list[str]) -> pd.DataFrame:
+    """ Daily returns of the assets; gaps are padded as in DataFrame.pct_change(). """
+    return asset_prices[assets].ffill().pct_change()
+
+
+# ************************ #
+# ------------------------ #
+# Incremental statistics
+# ------------------------ #
+# ************************ #
+
+class PrefixSum:
+    """
+    Growable prefix sums of a (rows, width) stream.
+    Appending k rows costs O(k) (amortised) and the sum over any row range costs O(1).
+    """
+
+    def __init__(self, width : int, capacity : int = 1024) -> None:
+        self._sums = np.zeros((capacity + 1, width))
+        self._n = 0
+
+    def __len__(self) -> int:
+        return self._n
+
+    def extend(self, values : np.ndarray) -> None:
+        values = np.asarray(values, dtype=float).reshape(-1, self._sums.shape[1])
+        n_new = self._n + len(values)
+        if n_new + 1 > len(self._sums):
+            grown = np.zeros((max(2 * len(self._sums), n_new + 1), self._sums.shape[1]))
+            grown[:self._n + 1] = self._sums[:self._n + 1]
+            self._sums = grown
+        self._sums[self._n + 1:n_new + 1] = self._sums[self._n] + np.cumsum(values, axis=0)
+        self._n = n_new
+
+    def window_sum(self, start, end) -> np.ndarray:
+        """ Sum of rows [start, end). start / end can be ints or arrays of ints. """
+        sums = self._sums
+        return sums[end] - sums[start]
+
+
+class RollingMoments:
+    """
+    Rolling mean & std (ddof=1) over a fixed window, updated with new rows only.
+
+    Mirrors DataFrame.rolling(window).mean() / .std(): a window containing a NaN
+    or an inf is NaN, and a window of identical values has a std of exactly 0
+    (the prefix-sum difference would only be ~0, which blows up shocks / std).
+    """
+
+    def __init__(self, window : int, width : int) -> None:
+        self.window = window
+        self.width = width
+        self._prefix = PrefixSum(3 * width)
+        # Last value & length of the current run of identical values, per column.
+        self._last = np.full(width, np.nan)
+        self._run = np.zeros(width, dtype=int)
+
+    def _update_runs(self, values : np.ndarray) -> np.ndarray:
+        """ Length of the run of identical values ending at each new row. """
+        rows = np.arange(len(values))[:, None]
+        same = values == np.vstack([self._last, values[:-1]])
+        last_break = np.maximum.accumulate(np.where(same, -1, rows), axis=0)
+        run = np.where(last_break >= 0, rows - last_break + 1, self._run + rows + 1)
+
+        self._last = values[-1]
+        self._run = run[-1]
+        return run
+
+    def update(self, values : np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Append rows and return the rolling (mean, std) for the appended rows.
+        """
+        values = np.asarray(values, dtype=float).reshape(-1, self.width)
+        if not len(values):
+            return np.empty((0, self.width)), np.empty((0, self.width))
+        valid = np.isfinite(values)
+        x = np.where(valid, values, 0.)
+        run = self._update_runs(values)
+
+        start = len(self._prefix)
+        self._prefix.extend(np.hstack([x, x * x, valid]))
+        ends = np.arange(start + 1, len(self._prefix) + 1)
+        sums = self._prefix.window_sum(np.maximum(ends - self.window, 0), ends)
+
+        w = self.window
+        s1, s2, count = sums[:, :self.width], sums[:, self.width:2 * self.width], sums[:, 2 * self.width:]
+        full = count == w
+
+        mean = np.where(full, s1 / w, np.nan)
+        if w > 1:
+            var = np.maximum((s2 - s1 * s1 / w) / (w - 1), 0.)
+            var[run >= w] = 0.
+        else:
+            var = np.full_like(s1, np.nan)
+        std = np.where(full, np.sqrt(var), np.nan)
+
+        return mean, std
+
+
+class RollingMax:
+    """
+    Rolling max over a fixed window with a monotonic deque, O(1) amortised per new value.
+    Like Series.rolling(window).max(), a window containing a NaN or an inf is NaN.
+    """
+
+    def __init__(self, window : int) -> None:
+        self.window = window
+        self._deque = collections.deque()
+        self._n = 0
+        self._last_invalid = -1
+
+    def update(self, values : np.ndarray) -> np.ndarray:
+        out = np.full(len(values), np.nan)
+        for i, value in enumerate(values):
+            idx = self._n
+            self._n += 1
+
+            if not np.isfinite(value):
+                self._last_invalid = idx
+                self._deque.clear()
+            else:
+                while self._deque and self._deque[-1][1] <= value:
+                    self._deque.pop()
+                self._deque.append((idx, value))
+            while self._deque and self._deque[0][0] <= idx - self.window:
+                self._deque.popleft()
+
+            if idx - self._last_invalid >= self.window:
+                out[i] = self._deque[0][1]
+        return out
+
+
+class ShockSignal:
+    """
+    Incremental version of the notebook's shock indicator & signal:
+        indicator = mean( shocks / shocks.rolling(std_window).std() )
+        signal    = indicator / indicator.rolling(max_window).max()
+    """
+
+    def __init__(self, width : int, std_window : int, max_window : int = 40) -> None:
+        self._moments = RollingMoments(std_window, width)
+        self._max = RollingMax(max_window)
+
+    def update(self, shocks : np.ndarray) -> np.ndarray:
+        """ Append new shock rows and return the signal for them. """
+        _, std = self._moments.update(shocks)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            scaled = np.asarray(shocks, dtype=float) / std
+            scaled[np.isnan(scaled).all(axis=1)] = 0.        # keep nanmean quiet, reset below
+            indicator = np.nanmean(scaled, axis=1)
+            indicator[np.isnan(std).all(axis=1)] = np.nan
+            return indicator / self._max.update(indicator)
+
+
+# ************************ #
+# ------------------------ #
+# Walk-forward engine
+# ------------------------ #
+# ************************ #
+
+class WalkForward:
+    """
+    Walk-forward evaluation of the shock signal.
+
+    The daily rows of `returns` are cut into consecutive test slices of `test_size` days,
+    each preceded by a training slice of `train_size` days (or all the history before it
+    when `expanding` is set). On every fold the std window is refitted: the candidate
+    window with the best in-sample Sharpe ratio is picked per asset, and its
+    out-of-sample PnL over the test slice is reported.
+
+    Signals, rolling moments and PnL prefix sums are extended fold by fold with the new
+    data only, so advancing a fold costs O(new data) rather than O(history). Scoring a
+    fold only reads the prefix sums, so it is O(1) per candidate window.
+    """
+
+    def __init__(
+        self,
+        shocks : pd.DataFrame,
+        returns : pd.DataFrame,
+        windows : list[int] = (20, 40, 60, 80),
+        train_size : int = 5 * TRADING_DAYS,
+        test_size : int = TRADING_DAYS,
+        expanding : bool = False,
+        max_window : int = 40,
+    ) -> None:
+        if train_size <= 0 or test_size <= 0:
+            raise ValueError("train_size and test_size must be positive.")
+        if not windows:
+            raise ValueError("At least one window is required.")
+        if any(w < 2 for w in windows):
+            raise ValueError("Windows must be at least 2 to compute a rolling std.")
+        if max_window < 1:
+            raise ValueError("max_window must be positive.")
+
+        self.windows = list(windows)
+        self.train_size = train_size
+        self.test_size = test_size
+        self.expanding = expanding
+
+        # No position can be taken before the first release.
+        self.shocks = shocks.sort_index()
+        self.returns = returns.sort_index().loc[self.shocks.index[0]:]
+        self.assets = list(self.returns.columns)
+
+        self._event_dates = self.shocks.index.values
+        self._shock_values = self.shocks.to_numpy(dtype=float)
+        self._return_values = self.returns.to_numpy(dtype=float)
+
+        # Incremental state: one signal / pnl stream per candidate window.
+        # Lengths are known up front, so buffers are preallocated and only new rows are written.
+        self._signals = {w: ShockSignal(self.shocks.shape[1], w, max_window) for w in self.windows}
+        self._signal_values = {w: np.full(len(self.shocks), np.nan) for w in self.windows}
+        self._pnl = {w: np.zeros((len(self.returns), len(self.assets))) for w in self.windows}
+        self._pnl_sums = {w: PrefixSum(2 * len(self.assets), capacity=len(self.returns)) for w in self.windows}
+        self._n_events = 0
+        self._n_days = 0
+
+    def folds(self) -> list[tuple[int, int, int]]:
+        """ (train_start, test_start, test_end) row positions of every fold. """
+        folds = []
+        test_start = self.train_size
+        while test_start < len(self.returns):
+            train_start = 0 if self.expanding else test_start - self.train_size
+            folds.append((train_start, test_start, min(test_start + self.test_size, len(self.returns))))
+            test_start += self.test_size
+        return folds
+
+    def _advance(self, end : int) -> None:
+        """ Feed the releases and daily returns up to row `end` into the incremental state. """
+        if end <= self._n_days:
+            return
+        days = self.returns.index.values[self._n_days:end]
+
+        # Position on day t is the signal as of the previous calendar day.
+        known = days - np.timedelta64(1, 'D')
+        n_events = int(np.searchsorted(self._event_dates, known[-1], side='right'))
+        event_idx = np.searchsorted(self._event_dates, known, side='right') - 1
+
+        for w in self.windows:
+            if n_events > self._n_events:
+                self._signal_values[w][self._n_events:n_events] = \
+                    self._signals[w].update(self._shock_values[self._n_events:n_events])
+
+            position = np.where(event_idx >= 0, self._signal_values[w][np.maximum(event_idx, 0)], np.nan)
+            # A zero rolling max gives an infinite position; its pnl is dropped like a missing one.
+            with np.errstate(invalid='ignore'):
+                pnl = self._return_values[self._n_days:end] * position[:, None]
+            pnl = np.where(np.isfinite(pnl), pnl, 0.)
+
+            self._pnl[w][self._n_days:end] = pnl
+            self._pnl_sums[w].extend(np.hstack([pnl, pnl * pnl]))
+
+        self._n_events = max(self._n_events, n_events)
+        self._n_days = end
+
+    def _sharpe(self, w : int, start : int, end : int) -> tuple[np.ndarray, np.ndarray]:
+        """ (total pnl, annualised sharpe) per asset over rows [start, end). """
+        sums = self._pnl_sums[w].window_sum(start, end)
+        n = len(self.assets)
+        total, total_sq, days = sums[:n], sums[n:], end - start
+
+        mean = total / days
+        var = np.maximum(total_sq / days - mean * mean, 0.)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            sharpe = np.where(var > 0, mean / np.sqrt(var) * np.sqrt(TRADING_DAYS), 0.)
+        return total, sharpe
+
+    def _evaluate_fold(self, fold : int, train_start : int, test_start : int, test_end : int) -> list[dict]:
+        """ Pick the window with the best in-sample sharpe per asset and score it out-of-sample. """
+        in_sample = np.array([self._sharpe(w, train_start, test_start)[1] for w in self.windows])
+        best = np.argmax(in_sample, axis=0)
+        index = self.returns.index
+
+        rows = []
+        for i, asset in enumerate(self.assets):
+            w = self.windows[best[i]]
+            oos_pnl, oos_sharpe = self._sharpe(w, test_start, test_end)
+            rows.append({
+                'fold': fold,
+                'asset': asset,
+                'train_start': index[train_start],
+                'test_start': index[test_start],
+                'test_end': index[test_end - 1],
+                'window': w,
+                'is_sharpe': in_sample[best[i], i],
+                'oos_pnl': oos_pnl[i],
+                'oos_sharpe': oos_sharpe[i],
+            })
+        return rows
+
+    def oos_pnl(self, results : pd.DataFrame) -> pd.DataFrame:
+        """ Daily out-of-sample pnl stitched from the windows selected in each fold. """
+        index = self.returns.index
+        frames = {asset: [] for asset in self.assets}
+        for _, row in results.iterrows():
+            i = self.assets.index(row['asset'])
+            start = index.get_loc(row['test_start'])
+            end = index.get_loc(row['test_end']) + 1
+            frames[row['asset']].append(pd.Series(self._pnl[row['window']][start:end, i], index=index[start:end]))
+
+        return pd.DataFrame({asset: pd.concat(series) if series else pd.Series(dtype=float) for asset, series in frames.items()})
+
+    def run(self) -> pd.DataFrame:
+        """
+        Run every fold and return one row per (fold, asset) with the selected window,
+        its in-sample sharpe and the out-of-sample pnl & sharpe.
+        """
+        results = []
+        for fold, (train_start, test_start, test_end) in enumerate(self.folds()):
+            self._advance(test_end)
+            results.extend(self._evaluate_fold(fold, train_start, test_start, test_end))
+
+        return pd.DataFrame(results, columns=[
+            'fold', 'asset', 'train_start', 'test_start', 'test_end', 'window', 'is_sharpe', 'oos_pnl', 'oos_sharpe'
+        ])
+
+
+def run_country(
+    country : str,
+    asset_prices : pd.DataFrame,
+    economic_data : dict,
+    **kwargs
+) -> tuple[WalkForward, pd.DataFrame]:
+    """ Walk-forward the shock signal of `country` on its own assets. """
+    shocks = calc_shocks(economic_data[country])
+    returns = calc_returns(asset_prices, COUNTRY_ASSETS[country])
+    engine = WalkForward(shocks, returns, **kwargs)
+    return engine, engine.run()
+
+
+def _help():
+    s = """
+    ERROR: CLI arguments can't be parsed.
+    Optional arguments include:
+        --country US|CA
+        --windows LIST-OF-WINDOWS-SEPARATED-BY-SPACES
+        --train DAYS
+        --test DAYS
+        --expanding
+    """
+    print(s)
+
+
+def _process_args(args):
+    """ Process the Command Line Arguments for the walk-forward run. """
+
+    countries = COUNTRIES
+    kwargs = {}
+
+    try:
+        i = 0
+        while i < len(args):
+
+            if args[i] == "--country":
+                countries = [args[i+1].upper()]
+                if countries[0] not in COUNTRIES:
+                    raise ValueError("Country is not supported.")
+                i += 2
+
+            elif args[i] == "--windows":
+                j = i + 1
+                while j < len(args) and not args[j].startswith("--"):
+                    j += 1
+                kwargs['windows'] = [int(x) for x in args[i+1:j]]
+                i = j
+
+            elif args[i] == "--train":
+                kwargs['train_size'] = int(args[i+1])
+                i += 2
+
+            elif args[i] == "--test":
+                kwargs['test_size'] = int(args[i+1])
+                i += 2
+
+            elif args[i] == "--expanding":
+                kwargs['expanding'] = True
+                i += 1
+
+            else:
+                raise ValueError("Incorrect formatting of CLI arguments.")
+    except:
+        _help()
+        raise
+
+    return countries, kwargs
+
+
+if __name__ == '__main__':
+
+    countries, kwargs = _process_args(sys.argv[1:])
+    asset_prices, economic_data = load_data()
+
+    for country in countries:
+        engine, results = run_country(country, asset_prices, economic_data, **kwargs)
+        print(f"\n{country} - out-of-sample pnl per fold")
+        print(results.pivot(index='test_start', columns='asset', values='oos_pnl').round(4))
+        print(f"\n{country} - total out-of-sample pnl")
+        print(results.groupby('asset')['oos_pnl'].sum().round(4))